@@ -7,8 +7,11 @@ with integrated Swagger documentation using Flasgger.
 """
 
 import asyncio
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 from celery import Celery
 from flask import Flask, jsonify, make_response
@@ -26,7 +29,20 @@ logger.propagate = False
 # File logging setup for detailed logs
 file_handler = logging.FileHandler('event_service.log')
 file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-logger.addHandler(file_handler)
+
+# Loggers only enqueue records; background listeners do the console and file writes,
+# so request threads never block on log I/O
+root_logger = logging.getLogger()
+root_queue, file_queue = queue.SimpleQueue(), queue.SimpleQueue()
+log_listeners = [
+    QueueListener(root_queue, *root_logger.handlers, respect_handler_level=True),
+    QueueListener(file_queue, file_handler),
+]
+root_logger.handlers = [QueueHandler(root_queue)]
+logger.addHandler(QueueHandler(file_queue))
+for listener in log_listeners:
+    listener.start()
+    atexit.register(listener.stop)
 
 
 
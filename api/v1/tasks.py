@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Background tasks for the service.
+
+The mail worker drains the Redis mail queue filled by `send_email` and delivers
+the emails in batches, reusing one SMTP connection per batch.
+
+Usage:
+    python -m api.v1.tasks
+"""
+
+import logging
+import time
+
+from api.v1.app import app
+from models import cache
+from models.engine.mail_service import MAIL_QUEUE, send_batch
+
+logger = logging.getLogger(__name__)
+
+MAIL_BATCH_SIZE = 50
+MAIL_POLL_TIMEOUT = 5  # Seconds to block waiting for the next email
+MAIL_RETRY_DELAY = 10  # Seconds to back off when Redis or the SMTP server is unreachable
+
+
+def drain_mail_queue(batch_size=MAIL_BATCH_SIZE, timeout=MAIL_POLL_TIMEOUT):
+    """
+    Deliver queued emails until the process is stopped.
+
+    :param batch_size: Maximum number of emails sent over one SMTP connection.
+    :param timeout: Seconds to block waiting for the next email.
+    """
+    with app.app_context():
+        while True:
+            batch = cache.pop_batch(MAIL_QUEUE, batch_size, timeout=timeout)
+            if batch is None:
+                # Redis is unreachable, wait before polling again
+                time.sleep(MAIL_RETRY_DELAY)
+                continue
+            if not batch:
+                continue
+
+            try:
+                unsent = send_batch(batch)
+            except Exception as e:
+                # Could not reach the SMTP server, put the batch back and retry later
+                logger.error(f"Failed to deliver mail batch: {e}")
+                cache.rpush(MAIL_QUEUE, *batch)
+                time.sleep(MAIL_RETRY_DELAY)
+                continue
+
+            if unsent:
+                # The connection dropped mid-batch, put the rest back and retry later
+                cache.rpush(MAIL_QUEUE, *unsent)
+                time.sleep(MAIL_RETRY_DELAY)
+
+
+if __name__ == '__main__':
+    drain_mail_queue()
@@ -0,0 +1,5 @@
+-- Soft-delete support for users (User.delete).
+-- create_all() only creates missing tables, so existing databases need this run once.
+ALTER TABLE users
+    ADD COLUMN deleted_at TIMESTAMP NULL DEFAULT NULL,
+    ADD INDEX ix_users_deleted_at (deleted_at);
@@ -1,8 +1,29 @@
-from models.engine.cache_engine import Cache
-from models.engine.db_storage import DBStorage
+"""
+Shared storage and cache engines, created on first use.
 
-storage = DBStorage()
+Importing a model or engine module therefore never connects to MySQL by itself;
+receipt worker processes, which only render PDFs, stay off the database.
+"""
+import threading
 
-storage.reload()
+_engines = {}
+_engines_lock = threading.Lock()
 
-cache = Cache()
+
+def __getattr__(name):
+    """Builds `storage` or `cache` the first time either is imported."""
+    if name not in ('storage', 'cache'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    with _engines_lock:
+        if name not in _engines:
+            if name == 'storage':
+                from models.engine.db_storage import DBStorage
+                _engines[name] = DBStorage()
+            else:
+                from models.engine.cache_engine import Cache
+                _engines[name] = Cache()
+        engine = _engines[name]
+
+    globals()[name] = engine  # Later lookups skip __getattr__
+    return engine
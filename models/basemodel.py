@@ -5,6 +5,7 @@ like id, timestamps, and CRUD operations.
 """
 
 import datetime
+from functools import lru_cache
 
 from sqlalchemy import TIMESTAMP, BigInteger, Column, func
 from sqlalchemy.ext.declarative import declarative_base
@@ -12,12 +13,46 @@ from sqlalchemy.ext.declarative import declarative_base
 Base = declarative_base()
 
 
-class BaseModel(Base):
+@lru_cache(maxsize=None)
+def _scalar_defaults(cls):
+    """
+    Collects the Python-side scalar column defaults of a model once per class.
+    """
+    return {column.name: column.default.arg for column in cls.__table__.columns
+            if column.default is not None and column.default.is_scalar}
+
+
+class DTOMixin:
+    """
+    Read-only DTO access for mapped models (see models/dto.py).
+    """
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        Builds the read-only DTO of this model from a row tuple in table column order.
+        """
+        from models.dto import dto_for
+        return dto_for(cls)(*row)
+
+    @classmethod
+    def all_dto(cls, filters=None, page=None, page_size=10):
+        """
+        Returns matching rows as read-only DTOs, skipping ORM instances entirely.
+        """
+        from models import storage
+        from models.dto import dto_for
+        return storage.select_as(cls, dto_for(cls), filters=filters, page=page, page_size=page_size)
+
+
+class BaseModel(DTOMixin, Base):
     """
     The BaseModel class provides common attributes and CRUD operations for all derived models.
     """
 
     __abstract__ = True  # Indicate this is an abstract base class
+    # Rows are soft-deleted or removed by id; skip the matched-row count check on DELETE
+    __mapper_args__ = {"confirm_deleted_rows": False}
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -25,6 +60,9 @@ class BaseModel(Base):
     deleted_at = Column(TIMESTAMP, nullable=True, default=None)
 
     def __init__(self, **kwargs):
+        # Apply column defaults up front so unsaved instances serialize like saved ones
+        for key, value in _scalar_defaults(type(self)).items():
+            kwargs.setdefault(key, value)
         for key, value in kwargs.items():
             setattr(self, key, value)
 
@@ -33,14 +71,15 @@ class BaseModel(Base):
         Converts the model instance into a dictionary format.
         """
         obj = {column.name: getattr(self, column.name) for column in self.__table__.columns}
-        obj["created_at"] = self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None
-        obj["updated_at"] = self.updated_at.strftime('%Y-%m-%d %H:%M:%S') if self.updated_at else None
-        obj["deleted_at"] = self.deleted_at.strftime('%Y-%m-%d %H:%M:%S') if self.deleted_at else None
+        # isoformat gives the same "YYYY-MM-DD HH:MM:SS" text as strftime, without parsing a format
+        obj["created_at"] = self.created_at.isoformat(sep=' ', timespec='seconds') if self.created_at else None
+        obj["updated_at"] = self.updated_at.isoformat(sep=' ', timespec='seconds') if self.updated_at else None
+        obj["deleted_at"] = self.deleted_at.isoformat(sep=' ', timespec='seconds') if self.deleted_at else None
         if "start_date" in self.__dict__:
-            obj["start_date"] = self.start_date.strftime('%Y-%m-%d') if self.start_date else None
-            obj["start_time"] = self.start_date.strftime('%H:%M:%S') if self.start_time else None
-            obj["end_date"] = self.end_date.strftime('%Y-%m-%d') if self.end_date else None
-            obj["end_time"] = self.end_time.strftime('%H:%M:%S') if self.end_time else None
+            obj["start_date"] = self.start_date.isoformat() if self.start_date else None
+            obj["start_time"] = self.start_time.isoformat(timespec='seconds') if self.start_time else None
+            obj["end_date"] = self.end_date.isoformat() if self.end_date else None
+            obj["end_time"] = self.end_time.isoformat(timespec='seconds') if self.end_time else None
 
         return obj
 
@@ -59,12 +98,25 @@ class BaseModel(Base):
 
     @classmethod
     def bulk_insert(cls, data_list):
+        """Inserts a list of column-name dicts; see DBStorage.bulk_insert."""
         from models import storage
         try:
             storage.bulk_insert(cls, data_list)
         except Exception as e:
             print(f"Error Inserting bulk: {e}")
 
+    @classmethod
+    def bulk_upsert(cls, data_list):
+        """
+        Inserts or updates many rows in one statement.
+
+        Every dict in data_list must have the same keys, including the primary key;
+        the keys of the first row decide which columns are updated. Errors are
+        logged by the storage and re-raised.
+        """
+        from models import storage
+        storage.bulk_upsert(cls, data_list)
+
     def update(self):
         from models import storage
         try:
@@ -74,9 +126,9 @@ class BaseModel(Base):
             print(f"Error updating model: {e}")
 
     @classmethod
-    def all(cls, page=None, page_size=10):
+    def all(cls, page=None, page_size=10, eager=()):
         from models import storage
-        return storage.all(cls, page=page, page_size=page_size)
+        return storage.all(cls, page=page, page_size=page_size, eager=eager)
 
     @classmethod
     def all_valid(cls, page=None, page_size=10):
@@ -99,7 +151,7 @@ class BaseModel(Base):
         return storage.count(cls=cls)
 
     @classmethod
-    def dynamic_query(cls, filters=None, page=None, page_size=10):
+    def dynamic_query(cls, filters=None, page=None, page_size=10, eager=()):
         from models import storage
         return storage.dynamic_query(cls, filters=filters, page=page,
-                                     page_size=page_size)
+                                     page_size=page_size, eager=eager)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Lightweight read-only mirrors of the models, for endpoints that only serialize.
+
+A DTO is a frozen dataclass with one slot per table column, built straight from a
+Core row tuple, so it carries no instance state, __dict__ or attribute
+instrumentation.
+"""
+
+from dataclasses import make_dataclass
+from functools import lru_cache
+from typing import Any
+
+from models.tickets import Ticket
+from models.tour import Tour
+from models.user import User
+
+
+@lru_cache(maxsize=None)
+def dto_for(model):
+    """
+    Builds the DTO class for a model, with its fields in table column order.
+
+    :param model: The mapped class to mirror.
+    :return: A slotted, frozen dataclass named after the model.
+    """
+    names = tuple(column.name for column in model.__table__.columns)
+    return make_dataclass(f'{model.__name__}DTO', [(name, Any) for name in names],
+                          namespace={'__slots__': names}, frozen=True)
+
+
+TicketDTO = dto_for(Ticket)
+TourDTO = dto_for(Tour)
+UserDTO = dto_for(User)
@@ -158,6 +158,60 @@ class Cache:
             print(f"Error setting expiration for key in Redis: {e}")
             return False
 
+    def rpush(self, key: str, *values: Union[str, bytes]) -> bool:
+        """
+        Appends one or more values to the tail of the list stored at `key`.
+
+        Parameters:
+            key (str): The Redis key of the list.
+            values (Union[str, bytes]): The values to append.
+
+        Returns:
+            bool: True if the operation is successful, False otherwise.
+        """
+        try:
+            self.__client.rpush(key, *values)
+            return True
+        except Exception as e:
+            print(f"Error pushing to list in Redis: {e}")
+            return False
+
+    def pop_batch(self, key: str, count: int, timeout: int = 0) -> Optional[List[bytes]]:
+        """
+        Pops up to `count` values from the head of the list stored at `key`,
+        blocking for up to `timeout` seconds until at least one is available.
+
+        Parameters:
+            key (str): The Redis key of the list.
+            count (int): Maximum number of values to pop.
+            timeout (int): Seconds to wait for the first value (0 waits forever).
+
+        Returns:
+            Optional[List[bytes]]: The popped values, empty if the timeout expired, None if Redis is unreachable.
+        """
+        try:
+            first = self.__client.blpop([key], timeout=timeout)
+        except Exception as e:
+            print(f"Error popping from Redis list '{key}': {e}")
+            return None
+
+        if not first:
+            return []
+        if count <= 1:
+            return [first[1]]
+
+        try:
+            # Drain the rest of the batch in one round trip
+            pipe = self.__client.pipeline()
+            pipe.lrange(key, 0, count - 2)
+            pipe.ltrim(key, count - 1, -1)
+            rest, _ = pipe.execute()
+        except Exception as e:
+            # The first value is already off the list; hand it back rather than lose it
+            print(f"Error popping batch from Redis list '{key}': {e}")
+            return [first[1]]
+        return [first[1]] + rest
+
     def keys(self, pattern: str = '*') -> List[bytes]:
         """
         Retrieves all keys matching a given pattern.
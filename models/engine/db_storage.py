@@ -9,15 +9,16 @@ import os
 from datetime import datetime
 from sqlite3 import OperationalError
 
-from dotenv import load_dotenv
-from sqlalchemy import and_, create_engine
+from sqlalchemy import and_, create_engine, func, select
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm import scoped_session, selectinload, sessionmaker
 
 from models.basemodel import Base
+from utils import load_env
 
 # Load environment variables from .env file
-load_dotenv()
+load_env()
 
 # Set up a logger for this module
 logger = logging.getLogger(__name__)
@@ -32,6 +33,9 @@ DB_PORT = int(os.environ.get('DB_PORT'))
 # Construct the database URL using MySQL connector
 DB_URL = f'mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
+# Rows sent per multi-row INSERT, keeping each statement well under max_allowed_packet
+BULK_INSERT_PAGE_SIZE = 1000
+
 
 class DBStorage:
     """
@@ -43,7 +47,8 @@ class DBStorage:
         """
         Initializes the DBStorage class and sets up the database engine.
         """
-        self.__engine = create_engine(DB_URL, echo=False, pool_pre_ping=True, pool_recycle=True)
+        self.__engine = create_engine(DB_URL, echo=False, pool_pre_ping=True, pool_recycle=True,
+                                      insertmanyvalues_page_size=BULK_INSERT_PAGE_SIZE)
         self.__session = None
         self.reload()
 
@@ -55,7 +60,8 @@ class DBStorage:
             self.__session.commit()
         except SQLAlchemyError as e:
             self.__session.rollback()
-            print(f"Error during save operation: {e}")
+            logger.error(f"Error during save operation: {e}")
+            raise
 
     def new(self, obj):
         """
@@ -92,6 +98,28 @@ class DBStorage:
         except SQLAlchemyError as e:
             print(f"Error during delete operation: {e}")
 
+    def bulk_upsert(self, cls, rows):
+        """
+        Inserts or updates many rows in a single statement using MySQL's
+        INSERT ... ON DUPLICATE KEY UPDATE.
+        :param cls: The class of the objects to upsert.
+        :param rows: List of dictionaries with the same keys, including the primary key.
+        """
+        if not rows:
+            return
+
+        try:
+            stmt = insert(cls.__table__).values(rows)
+            changes = {key: stmt.inserted[key] for key in rows[0] if key not in ('id', 'created_at')}
+            if 'updated_at' in cls.__table__.columns:
+                changes['updated_at'] = func.now()
+            self.__session.execute(stmt.on_duplicate_key_update(changes))
+            self.__session.commit()
+        except SQLAlchemyError as e:
+            self.__session.rollback()
+            logger.error(f"Error during bulk upsert: {e}")
+            raise
+
     def reload(self):
         """
         Reloads the connection to the database, creating all tables from metadata
@@ -128,7 +156,7 @@ class DBStorage:
             print(f"Error retrieving object by name: {e}")
             return None
 
-    def dynamic_query(self, cls, filters=None, page=None, page_size=10):
+    def dynamic_query(self, cls, filters=None, page=None, page_size=10, eager=()):
         """
         Performs a dynamic query on the given class based on the provided filters.
 
@@ -136,11 +164,12 @@ class DBStorage:
         :param filters: A dictionary of field-value pairs to filter by.
         :param page: Optional page number for pagination (1-indexed).
         :param page_size: Number of items per page for pagination.
+        :param eager: Names of relationships to load and include in each result.
         :return: A list of matching objects or an empty list if none found.
         """
         try:
             # Start with a base query for the class
-            query = self.__session.query(cls)
+            query = self.__eager_query(cls, eager)
 
             # Apply filters dynamically
             if filters:
@@ -151,12 +180,93 @@ class DBStorage:
             query = self.__apply_pagination(query, page, page_size)
 
             # Execute the query and return results as dictionaries
-            return [obj.to_dict() for obj in query.all()]
+            return [self.__to_dict(obj, eager) for obj in query.all()]
 
         except SQLAlchemyError as e:
             print(f"Error during dynamic query: {e}")
             return []
 
+    def select_rows(self, cls, filters=None, page=None, page_size=10):
+        """
+        Core counterpart of dynamic_query: selects from the class's table directly and
+        returns the rows as plain dictionaries, without building ORM instances.
+
+        :param cls: The class whose table is queried.
+        :param filters: A dictionary of column-value pairs to filter by.
+        :param page: Optional page number for pagination (1-indexed).
+        :param page_size: Number of items per page for pagination.
+        :return: A list of dictionaries keyed by column name, or an empty list if none found.
+        """
+        try:
+            stmt = self.__select(cls, filters, page, page_size)
+            return [dict(row) for row in self.__session.execute(stmt).mappings()]
+        except SQLAlchemyError as e:
+            print(f"Error during select: {e}")
+            return []
+
+    def select_as(self, cls, factory, filters=None, page=None, page_size=10):
+        """
+        Like select_rows, but builds each result by unpacking the row tuple, in table
+        column order, into `factory`.
+
+        :param cls: The class whose table is queried.
+        :param factory: Callable taking one positional argument per column, e.g. a DTO class.
+        :param filters: A dictionary of column-value pairs to filter by.
+        :param page: Optional page number for pagination (1-indexed).
+        :param page_size: Number of items per page for pagination.
+        :return: A list of `factory` results, or an empty list if none found.
+        """
+        try:
+            stmt = self.__select(cls, filters, page, page_size)
+            return [factory(*row) for row in self.__session.execute(stmt)]
+        except SQLAlchemyError as e:
+            print(f"Error during select: {e}")
+            return []
+
+    def iter_rows(self, cls, chunk=1000):
+        """
+        Yields every row of the class's table as a dictionary, reading `chunk` rows
+        per query with keyset pagination on the primary key.
+
+        mysql-connector buffers whole result sets, so one streamed SELECT would still
+        hold the table in memory; seeking past the last id seen keeps only one chunk
+        in memory, and each query is an index range scan however deep the scan goes.
+
+        :param cls: The class whose table is scanned.
+        :param chunk: Number of rows read per query.
+        :return: A generator of dictionaries keyed by column name.
+        """
+        table = cls.__table__
+        stmt = select(table).order_by(table.c.id).limit(chunk)
+        last_id = None
+        try:
+            while True:
+                page = stmt if last_id is None else stmt.where(table.c.id > last_id)
+                rows = [dict(row) for row in self.__session.execute(page).mappings()]
+                yield from rows
+                if len(rows) < chunk:
+                    return
+                last_id = rows[-1]['id']
+        except SQLAlchemyError as e:
+            # Re-raised so callers cannot mistake a truncated scan for a complete one
+            logger.error(f"Error while iterating rows: {e}")
+            raise
+
+    def __select(self, cls, filters, page, page_size):
+        """
+        Builds a paginated Core select over the class's table.
+        :param cls: The class whose table is queried.
+        :param filters: A dictionary of column-value pairs to filter by.
+        :param page: Page number for pagination (1-indexed).
+        :param page_size: Number of items per page.
+        :return: The select statement.
+        """
+        table = cls.__table__
+        stmt = select(table)
+        if filters:
+            stmt = stmt.where(and_(*[table.c[key] == value for key, value in filters.items()]))
+        return self.__apply_pagination(stmt, page, page_size)
+
     def count(self, cls):
         """
         Count the number of objects in the database by the class type.
@@ -170,13 +280,14 @@ class DBStorage:
             print(f"Error counting the object: {e}")
             return 0
 
-    def all(self, cls=None, page=None, page_size=10):
+    def all(self, cls=None, page=None, page_size=10, eager=()):
         """
         Retrieves all objects from the database for a given class with optional pagination.
         If no class is provided, returns all objects across all classes.
         :param cls: The class of the objects to retrieve. If None, retrieves all objects.
         :param page: Page number for pagination (1-indexed).
         :param page_size: Number of items per page for pagination.
+        :param eager: Names of relationships of cls to load and include in each result.
         :return: A list of objects or a dictionary of lists if cls is None.
         """
         try:
@@ -188,8 +299,8 @@ class DBStorage:
                     result[clss.__name__] = [obj.to_dict() for obj in objs]
                 return result
             else:
-                query = self.__apply_pagination(self.__session.query(cls), page, page_size)
-                return [obj.to_dict() for obj in query.all()]
+                query = self.__apply_pagination(self.__eager_query(cls, eager), page, page_size)
+                return [self.__to_dict(obj, eager) for obj in query.all()]
         except SQLAlchemyError as e:
             print(f"Error retrieving all objects: {e}")
             return []
@@ -231,6 +342,33 @@ class DBStorage:
             self.__engine.dispose()
             self.__session = None
 
+    def __eager_query(self, cls, eager):
+        """
+        Builds a query for a class that loads the given relationships up front,
+        with one extra SELECT per relationship instead of one per row.
+        :param cls: The class of the objects to query.
+        :param eager: Names of relationships to load.
+        :return: The query.
+        """
+        query = self.__session.query(cls)
+        if eager:
+            query = query.options(*[selectinload(getattr(cls, name)) for name in eager])
+        return query
+
+    @staticmethod
+    def __to_dict(obj, eager):
+        """
+        Converts an object to a dictionary, adding its eagerly loaded relationships.
+        :param obj: The object to convert.
+        :param eager: Names of the relationships loaded with the object.
+        :return: The dictionary.
+        """
+        result = obj.to_dict()
+        for name in eager:
+            related = getattr(obj, name)
+            result[name] = related.to_dict() if related is not None else None
+        return result
+
     def __apply_pagination(self, query, page, page_size):
         """
         Applies pagination to a query.
@@ -245,20 +383,45 @@ class DBStorage:
     
     def bulk_insert(self, cls, data_list):
         """
-        Bulk inserts objecys from a list of dictionaries.
-        Checks for existing users by email and name and only inserts new records.
-        
-        :param data_list: List of user data dictionaries with 'name' and 'email' keys.
-        """ 
-        
+        Bulk inserts objects from a list of dictionaries.
+
+        Rows go through a Core executemany instead of the ORM bulk path; the MySQL
+        driver rewrites it into a single multi-row INSERT, so no mappers or unit of
+        work are involved. Rows are sent BULK_INSERT_PAGE_SIZE at a time, all within
+        one transaction. As with bulk_insert_mappings, None values are left out of
+        the INSERT, so Python-side and server defaults still apply to them.
+
+        :param cls: The class of the objects to insert.
+        :param data_list: List of dictionaries mapping column names to values, not
+            model instances.
+        """
+        if not data_list:
+            return
+
         try:
-            self.__session.bulk_insert_mappings(cls, data_list)
+            stmt = insert(cls.__table__)
+            for rows in self.__group_by_keys(data_list).values():
+                for start in range(0, len(rows), BULK_INSERT_PAGE_SIZE):
+                    self.__session.execute(stmt, rows[start:start + BULK_INSERT_PAGE_SIZE])
             self.__session.commit()
         except SQLAlchemyError as e:
-            logger.error(e)
             self.__session.rollback()
-            print(f"Error during bulk insert: {e}")
-        
+            logger.error(f"Error during bulk insert: {e}")
+            raise
+
+    @staticmethod
+    def __group_by_keys(data_list):
+        """
+        Drops None values and groups the rows by the keys they have left, since one
+        executemany needs the same keys in every row.
+        :param data_list: List of dictionaries mapping column names to values.
+        :return: Dictionary mapping each key set to its rows.
+        """
+        groups = {}
+        for data in data_list:
+            row = {key: value for key, value in data.items() if value is not None}
+            groups.setdefault(frozenset(row), []).append(row)
+        return groups
 
     def is_live(self):
         """
@@ -1,10 +1,22 @@
 # email_service.py
 
+import base64
+import json
+import smtplib
+import socket
+
 from flask_mail import Mail, Message
 
 # Initialize Flask-Mail
 mail = Mail()
 
+# Redis list holding emails waiting to be delivered by the mail worker
+MAIL_QUEUE = 'mail:queue'
+
+# Errors that mean the SMTP connection is gone, as opposed to one email being rejected
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                      smtplib.SMTPHeloError, ConnectionError, socket.timeout)
+
 
 def init_app(app):
     mail.init_app(app)
@@ -12,7 +24,10 @@ def init_app(app):
 
 def send_email(subject, recipients, body, html_body=None, attachments=None):
     """
-    Send an email with the specified subject, recipients, content, and optional attachments from a stream.
+    Queue an email with the specified subject, recipients, content, and optional attachments from a stream.
+
+    The email is pushed to a Redis list and delivered in batches by the mail worker
+    (see api/v1/tasks.py), so the request never waits on the SMTP handshake.
 
     Args:
         subject (str): Subject of the email.
@@ -23,22 +38,73 @@ def send_email(subject, recipients, body, html_body=None, attachments=None):
                                       Each tuple should be (filename, file_stream, mimetype).
 
     Returns:
-        bool: True if email is sent successfully, False otherwise.
+        bool: True if email is queued successfully, False otherwise.
     """
+    from models import cache
     try:
-        msg = Message(subject, recipients=recipients, sender='no-reply@chaleapp.org')
-        msg.body = body
-        if html_body:
-            msg.html = html_body
+        payload = {
+            'subject': subject,
+            'recipients': recipients,
+            'body': body,
+            'html_body': html_body,
+            'attachments': []
+        }
 
         # Add attachments, if any
         if attachments:
             for filename, file_stream, mimetype in attachments:
                 file_stream.seek(0)  # Ensure the stream is at the beginning
-                msg.attach(filename, mimetype, file_stream.read())
+                content = base64.b64encode(file_stream.read()).decode('ascii')
+                payload['attachments'].append([filename, mimetype, content])
 
-        mail.send(msg)
-        return True
+        return cache.rpush(MAIL_QUEUE, json.dumps(payload))
     except Exception as e:
-        print(f"Failed to send email: {e}")
+        print(f"Failed to queue email: {e}")
         return False
+
+
+def send_batch(payloads):
+    """
+    Deliver a batch of queued emails over a single SMTP connection.
+
+    Emails that fail on their own (bad payload, refused recipient) are logged and
+    dropped. If the connection itself fails, sending stops and the emails not yet
+    sent are returned so the caller can queue them again.
+
+    Must be called within an application context.
+
+    Args:
+        payloads (list): JSON-encoded emails, as queued by `send_email`.
+
+    Returns:
+        list: The payloads left unsent because the SMTP connection failed.
+    """
+    pending = 0  # Index of the first payload not yet handled
+    try:
+        with mail.connect() as conn:
+            for raw in payloads:
+                try:
+                    conn.send(_build_message(raw))
+                except _CONNECTION_ERRORS:
+                    raise
+                except Exception as e:
+                    print(f"Failed to send email: {e}")
+                pending += 1
+    except _CONNECTION_ERRORS as e:
+        print(f"SMTP connection failed with {len(payloads) - pending} emails left to send: {e}")
+    return payloads[pending:]
+
+
+def _build_message(raw):
+    """
+    Rebuild a Flask-Mail message from its queued JSON form.
+    """
+    payload = json.loads(raw)
+    msg = Message(payload['subject'], recipients=payload['recipients'], sender='no-reply@chaleapp.org')
+    msg.body = payload['body']
+    if payload['html_body']:
+        msg.html = payload['html_body']
+
+    for filename, mimetype, content in payload['attachments']:
+        msg.attach(filename, mimetype, base64.b64decode(content))
+    return msg
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the PDF receipt generators.
+"""
+
+import atexit
+import io
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+
+from PIL import Image
+from fpdf import FPDF
+
+# LANCZOS is only worth its cost when explicitly asked for
+_HIGH_QUALITY_LOGO = os.getenv('RECEIPT_HIGH_QUALITY_LOGO') == '1'
+
+# Keep generated images in RAM when the host has a tmpfs mount
+_TEMP_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+_temp_files = []
+
+
+@atexit.register
+def _remove_temp_files():
+    """Deletes the images written by this process."""
+    for path in _temp_files:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def temp_png(image, **save_options):
+    """
+    Writes an image to a temporary PNG file (on tmpfs when available) that is
+    removed when the process exits.
+
+    Parameters:
+        image (Image): The image to write.
+        **save_options: Extra options passed to Image.save.
+
+    Returns:
+        str: Path to the PNG file.
+    """
+    temp_file = tempfile.NamedTemporaryFile(suffix=".png", dir=_TEMP_DIR, delete=False)
+    image.save(temp_file, format="PNG", **save_options)
+    temp_file.close()
+    _temp_files.append(temp_file.name)
+    return temp_file.name
+
+
+def discard_temp_png(path):
+    """Deletes a file written by temp_png before the process exits."""
+    try:
+        _temp_files.remove(path)
+        os.remove(path)
+    except (ValueError, OSError):
+        pass
+
+
+def pdf_stream(pdf):
+    """
+    Renders an FPDF document into an in-memory stream.
+
+    fpdf 1.7 returns the document as a latin-1 str, fpdf2 as bytes; only the str
+    needs converting.
+
+    Returns:
+        io.BytesIO: The rendered PDF.
+    """
+    raw = pdf.output(dest="S")
+    if isinstance(raw, str):
+        raw = raw.encode("latin1")
+    return io.BytesIO(raw)
+
+
+@lru_cache(maxsize=4)
+def cached_logo(path, width, height):
+    """
+    Resizes a logo once per size and keeps the result for every later receipt.
+
+    Logos shipped pre-sized next to the source (e.g. web-logo-150.png for a 150x150
+    web-logo.png) are used as they are. Otherwise, since FPDF only accepts image
+    paths, the resized logo is written to a temporary PNG file (on tmpfs when
+    available) that is removed when the process exits.
+
+    Parameters:
+        path (str): Path to the source logo.
+        width (int): Target width in pixels.
+        height (int): Target height in pixels.
+
+    Returns:
+        str: Path to the resized PNG.
+    """
+    if width == height:
+        root, ext = os.path.splitext(path)
+        presized = f"{root}-{width}{ext}"
+        if os.path.isfile(presized):
+            return presized
+
+    with Image.open(path) as img:
+        if _HIGH_QUALITY_LOGO:
+            resized_logo = img.resize((width, height), Image.Resampling.LANCZOS)
+        else:
+            # reducing_gap box-shrinks the image first, then filters the small intermediate
+            resized_logo = img.resize((width, height), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        return temp_png(resized_logo, optimize=False, compress_level=1)
+
+
+class FontCacheMixin:
+    """Mixin for FPDF documents that skips set_font calls for the font already in use."""
+
+    _font_key = None
+
+    def _safe_set_font(self, family, style="", size=0):
+        """Sets the font, skipping the call when it is already the current one."""
+        key = (family, style, size)
+        if key == self._font_key:
+            return
+        self.set_font(family, style, size)
+        self._font_key = key
+
+
+@lru_cache(maxsize=8)
+def _parsed_image(path):
+    """
+    Parses an image the way FPDF.image() does, once per path.
+
+    Returns:
+        bytes: The pickled FPDF image entry, unpickled into a fresh copy per document
+        since FPDF drops the image data once the document is written.
+    """
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.image(path, x=0, y=0, w=1)
+    return pickle.dumps(pdf.images[path])
+
+
+class ImageCacheMixin:
+    """Mixin for FPDF documents that reuses the decoded form of static images."""
+
+    def _cached_image(self, path, x, y, w=0, h=0):
+        """Places an image, skipping FPDF's PNG decode and re-compression for known paths."""
+        if path not in self.images:
+            info = pickle.loads(_parsed_image(path))
+            info['i'] = len(self.images) + 1
+            self.images[path] = info
+            # FPDF raises the version for soft masks while parsing, which here happened
+            # on the throwaway document
+            if 'smask' in info:
+                self.pdf_version = max(self.pdf_version, '1.4')
+        self.image(path, x=x, y=y, w=w, h=h)
@@ -5,13 +5,54 @@ QrCodeEngine - Generates QR codes with embedded logos for event tickets.
 This class creates a QR code based on unique user data and overlays a logo in the center.
 """
 
-import tempfile
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 
 import qrcode
 from PIL import Image
-from dotenv import load_dotenv
 
-load_dotenv()
+from models.engine.pdf_utils import discard_temp_png, temp_png
+
+LOGO_PATH = './assets/chale.png'
+
+# Paths of the most recently generated QR codes, keyed by reference
+QR_CACHE_SIZE = 1024
+_qr_paths = OrderedDict()
+_qr_paths_lock = threading.Lock()
+
+# One QRCode encoder per thread, cleared and reused between calls
+_local = threading.local()
+
+
+@lru_cache(maxsize=8)
+def _logo(size):
+    """
+    Loads and resizes the QR code logo once per output size.
+
+    Parameters:
+        size (tuple): The (width, height) the logo should be resized to.
+
+    Returns:
+        Image: The resized RGBA logo, shared between calls.
+    """
+    with Image.open(LOGO_PATH) as logo:
+        return logo.resize(size, Image.Resampling.BILINEAR).convert('RGBA')
+
+
+def _encoder():
+    """Returns this thread's QRCode instance, creating it on first use."""
+    qr = getattr(_local, 'qr', None)
+    if qr is None:
+        qr = _local.qr = qrcode.QRCode(
+            version=None,
+            # H (30% recovery) is what lets the code survive the logo pasted over its centre
+            error_correction=qrcode.constants.ERROR_CORRECT_H,
+            box_size=10,
+            border=4,
+        )
+    return qr
 
 
 class QrCodeEngine:
@@ -20,7 +61,7 @@ class QrCodeEngine:
     def __init__(self, reference):
         """
         Initializes the QrCodeEngine with the user's ID.
-        
+
         Parameters:
             user_id (str): Unique identifier for the user.
         """
@@ -29,34 +70,65 @@ class QrCodeEngine:
     def generate_code(self):
         """
         Generates a QR code containing a unique code based on the user's ID and a timestamp.
-        
+
         Returns:
             str: Path to the temporary file containing the QR code image.
         """
-        logo_path = './assets/chale.png'
-
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=4,
-        )
+        qr = _encoder()
+        qr.clear()
+        qr.version = None  # Let make() pick the smallest version for this reference
         qr.add_data(self.reference)
         qr.make(fit=True)
-        qr_img = qr.make_image(fill='black', back_color='white').convert('RGBA')
-
-        with Image.open(logo_path) as logo:
-            logo_size = (qr_img.size[0] // 4, qr_img.size[1] // 4)
-            logo = logo.resize(logo_size, Image.Resampling.LANCZOS)
-            logo_position = (
-                (qr_img.size[0] - logo.size[0]) // 2,
-                (qr_img.size[1] - logo.size[1]) // 2
-            )
-            qr_img.paste(logo, logo_position, logo)
-
-        # Create a temporary file to store the QR code
-        temp_file = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-        qr_img.save(temp_file, format='PNG')
-        temp_file.close()
-
-        return temp_file.name  # Return the file path for use in FPDF
+        # The QR itself is black and white, so RGB is enough; the logo's alpha is used as the paste mask
+        qr_img = qr.make_image(fill_color='black', back_color='white').convert('RGB')
+
+        logo = _logo((qr_img.size[0] // 4, qr_img.size[1] // 4))
+        logo_position = (
+            (qr_img.size[0] - logo.size[0]) // 2,
+            (qr_img.size[1] - logo.size[1]) // 2
+        )
+        qr_img.paste(logo, logo_position, logo.getchannel('A'))
+
+        return temp_png(qr_img)  # Return the file path for use in FPDF
+
+
+def qr_code_for(reference):
+    """
+    Generates the QR code for a reference once and reuses it on later calls,
+    e.g. when a user downloads the same ticket again.
+
+    The file of the least recently used code is deleted once QR_CACHE_SIZE codes
+    are cached, and a code whose file has gone missing is rendered again.
+
+    Parameters:
+        reference (str): The data encoded in the QR code.
+
+    Returns:
+        str: Path to the temporary file containing the QR code image.
+    """
+    with _qr_paths_lock:
+        path = _qr_paths.get(reference)
+        if path is not None:
+            _qr_paths.move_to_end(reference)
+    if path is not None and os.path.exists(path):
+        return path
+    stale = path
+
+    path = QrCodeEngine(reference).generate_code()
+    evicted = []
+    with _qr_paths_lock:
+        current = _qr_paths.get(reference)
+        if current is not None and current != stale and os.path.exists(current):
+            # Another thread rendered the same reference meanwhile; keep its file
+            evicted.append(path)
+            path = current
+        else:
+            if current is not None:
+                evicted.append(current)
+            _qr_paths[reference] = path
+            _qr_paths.move_to_end(reference)
+            while len(_qr_paths) > QR_CACHE_SIZE:
+                evicted.append(_qr_paths.popitem(last=False)[1])
+    for old_path in evicted:
+        discard_temp_png(old_path)
+    return path
@@ -1,26 +1,98 @@
+import asyncio
+import hashlib
+import html
 import io
+import json
+import multiprocessing
 import os
+import re
 import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 import pikepdf
-from PIL import Image
-from dotenv import load_dotenv
+from PyPDF2 import PdfMerger
 from fpdf import FPDF, HTMLMixin
 
-from models.engine.qr_code_engine import QrCodeEngine
-
-load_dotenv()
+from models.engine.pdf_utils import FontCacheMixin, ImageCacheMixin, cached_logo, pdf_stream
+from models.engine.qr_code_engine import qr_code_for
+from utils import load_env
+
+# Load environment variables from .env file
+load_env()
+
+# Customer service contact printed on every receipt
+CUSTOMER_SERVICE_PHONE = os.getenv('CUSTOMER_SERVICE_PHONE', '233 27 517 7177')
+CUSTOMER_SERVICE_ADDRESS = os.getenv('CUSTOMER_SERVICE_ADDRESS', '')
+
+# Receipt rendering and encryption are CPU-bound, so they run in worker processes
+RECEIPT_WORKERS = int(os.getenv('RECEIPT_WORKERS', os.cpu_count() or 1))
+_receipt_pool = None
+_receipt_pool_lock = threading.Lock()
+
+# Encrypted receipts are kept in Redis so retries and re-downloads skip regeneration
+RECEIPT_CACHE_TTL = 7 * 24 * 60 * 60
+
+
+def _get_receipt_pool():
+    """
+    Returns the receipt process pool, creating it on first use.
+
+    Workers come from a forkserver (spawn where unavailable) rather than a plain
+    fork, since by then the web process already runs threads such as the log
+    listeners.
+    """
+    global _receipt_pool
+    with _receipt_pool_lock:
+        if _receipt_pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _receipt_pool = ProcessPoolExecutor(max_workers=RECEIPT_WORKERS,
+                                                mp_context=multiprocessing.get_context(method))
+        return _receipt_pool
+
+
+def _discard_receipt_pool(pool):
+    """Drops a broken pool so the next call builds a fresh one."""
+    global _receipt_pool
+    with _receipt_pool_lock:
+        if _receipt_pool is pool:
+            _receipt_pool = None
+    pool.shutdown(wait=False)
+
+
+async def _run_in_receipt_pool(func, *args):
+    """
+    Runs a function in the receipt process pool, rebuilding the pool once if a
+    crashed worker has left it broken.
+    """
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = _get_receipt_pool()
+        try:
+            return await loop.run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            _discard_receipt_pool(pool)
+            if attempt:
+                raise
+
+
+async def _prepare_images(load_logo, reference):
+    """
+    Prepares the logo and the QR code concurrently in the default executor,
+    keeping both off the event loop.
+
+    :param load_logo: Callable returning the path of the resized logo.
+    :param reference: The reference encoded in the QR code.
+    :return: The logo path and the QR code path.
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(
+        loop.run_in_executor(None, load_logo),
+        loop.run_in_executor(None, qr_code_for, reference)
+    )
 
 
-from fpdf import FPDF
-import io
-
-import os
-from fpdf import FPDF
-import io
-import tempfile
-from PyPDF2 import PdfMerger
-
 class BulkQRcodePDF(FPDF):
     def __init__(self, data_list):
         pos_width_mm = 58
@@ -37,9 +109,7 @@ class BulkQRcodePDF(FPDF):
 
     def _generate_qr_image(self, data):
         """Generates and returns a QR code image path for given data."""
-        qr_engine = QrCodeEngine(str(data))
-        qr_path = qr_engine.generate_code()  # This generates and saves the QR code image file
-        return qr_path
+        return qr_code_for(str(data))
 
     def _insert_qr_image(self, qr_path):
         """Inserts a pre-generated QR code into the PDF."""
@@ -54,8 +124,7 @@ class BulkQRcodePDF(FPDF):
             self._insert_qr_image(self.qr_images[idx])  # Insert pre-generated QR code image
             # Optionally add more page-specific content
 
-        pdf_bytes = self.output(dest="S").encode("latin1")
-        return io.BytesIO(pdf_bytes)
+        return pdf_stream(self)
 
     async def create_receipt(self, batch_size=50):
         """Creates multiple PDF batches, then combines them."""
@@ -113,8 +182,7 @@ class QRcodePDF(FPDF):
         """Generates and inserts a QR code based on user phone data."""
         # token = jwt.encode(payload=self.data, key=os.getenv('JWT_SECRET'), algorithm="HS256")
 
-        qr_engine = QrCodeEngine(str(self.data))
-        qr_path = qr_engine.generate_code()  # Get path to QR code image file
+        qr_path = qr_code_for(str(self.data))  # Get path to QR code image file
         image_width, image_height = 25, 25
         x_position = (self.w+3 - self.qr_size) / 2
         self.image(qr_path, x=x_position, y=15, w=image_width, h=image_height)
@@ -123,8 +191,7 @@ class QRcodePDF(FPDF):
         """Generates the receipt PDF content asynchronously."""
         self.add_page()
         self._insert_qr_image()
-        pdf_bytes = self.output(dest="S").encode("latin1")
-        return io.BytesIO(pdf_bytes)
+        return pdf_stream(self)
     
     async def create_receipt(self):
         """Generates the POS receipt and returns it as an in-memory PDF file."""
@@ -135,14 +202,16 @@ class QRcodePDF(FPDF):
 
 
 
-class Receipt(FPDF, HTMLMixin):
+class Receipt(FontCacheMixin, ImageCacheMixin, FPDF, HTMLMixin):
     """Class to generate and encrypt PDF receipts asynchronously for event tickets."""
 
     def __init__(self, data, paper_size="A4"):
         super().__init__()
         self.data = data
-        self.logo_stream = None
         self.paper_size = paper_size
+        self.logo_path = None
+        self.qr_path = None
+        self._html_parser = None
 
     def _add_static_elements(self):
         """Adds static elements like borders, title, and logo to the receipt."""
@@ -158,77 +227,71 @@ class Receipt(FPDF, HTMLMixin):
 
     def _set_title(self, title='Benny Osbon Limited.'):
         """Sets the receipt title."""
-        self.set_font("Helvetica", "B", 10)
+        self._safe_set_font("Helvetica", "B", 10)
         self.cell(0, 10, title, ln=True, align="C")
 
     def _load_logo(self, logo_path='./assets/web-logo.png'):
-        """Load, resize, and cache the logo image to reduce lag."""
-        if not self.logo_stream:
-            with Image.open(logo_path) as img:
-                resized_logo = img.resize((150, 150), Image.Resampling.LANCZOS)
-                temp_file = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-                resized_logo.save(temp_file, format="PNG")
-                temp_file.close()
-            return temp_file.name
+        """Return the resized logo, shared by every receipt in the process."""
+        return cached_logo(logo_path, 150, 150)
 
     def _set_logo(self):
         """Place the logo in the PDF using the cached image stream."""
-        logo = self._load_logo()  # Ensure logo is loaded and cached
+        logo = self.logo_path or self._load_logo()  # Ensure logo is loaded and cached
         x_position = (210 - 50) / 2
-        self.image(logo, x=x_position, y=5, w=50, h=50)
+        self._cached_image(logo, x=x_position, y=5, w=50, h=50)
 
     def _insert_qr_image(self):
         """Generates and inserts a QR code based on user phone data."""
-        qr_engine = QrCodeEngine(self.data['reference'])
-        qr_path = qr_engine.generate_code()  # Get path to QR code image file
+        qr_path = self.qr_path or qr_code_for(self.data['reference'])  # Get path to QR code image file
         image_width, image_height = 100, 100
         x_position = (210 - image_width) / 2
         self.image(qr_path, x=x_position, y=35, w=image_width, h=image_height)
 
     def _set_text(self, text, font_size=14, spacing=100, bold=True, wrap_width=190):
         """Adds HTML-formatted text to the receipt, centering and wrapping lines as needed."""
-        self.set_font("Helvetica", "B" if bold else "", font_size)
-
-        # Set the x position to the starting point
-        self.set_xy(10, spacing)
-
-        # First, we will create a temporary buffer to store the multi-cell output
-        buffer = io.StringIO()
-
-        # Parse and add HTML content
-        parser = HTMLTextParser(self, wrap_width)
-        parser.feed(text)
-
-        # Get the total height after wrapping
-        total_height = parser.total_height  # Assuming your HTML parser can track this
+        self._safe_set_font("Helvetica", "B" if bold else "", font_size)
 
         # Calculate the x position for center alignment
-        self.set_xy(10, spacing)  # Reset to the original position
         center_x = (210 - wrap_width) / 2  # Centering based on wrap width
-        self.set_x(center_x)
-
-        # Render each line to ensure wrapping
-        for line in buffer.getvalue().splitlines():
-            self.multi_cell(wrap_width, 10, line, align="C")
+        self.set_xy(center_x, spacing)
+
+        # Plain text needs no parsing; multi_cell wraps it and leaves the cursor below it
+        if "<" not in text:
+            self.multi_cell(wrap_width, 10, text, align="C")
+            return
+
+        # Parse and add HTML content, reusing one parser for the whole receipt
+        parser = self._html_parser
+        if parser is None:
+            parser = self._html_parser = HTMLTextParser(self, wrap_width)
+        else:
+            parser.reset()
+            parser.wrap_width = wrap_width
+        parser.feed(text)
 
         # Move the cursor down by total_height after rendering
-        self.set_y(spacing + total_height)
+        self.set_y(spacing + parser.total_height)
 
     def _add_map_link(self):
         """Adds a clickable Google Maps link to the event location in the PDF."""
         self.set_xy(10, 265)
-        self.set_font("Helvetica", "B", 10)
+        self._safe_set_font("Helvetica", "B", 10)
         self.set_text_color(0, 0, 255)
         self.cell(0, 10, "Click here for Event Location", align="C", link=self.data['event_coordinates'])
 
     def _add_phone_link(self):
         # Add a clickable phone number
-        phone_link = f"tel:{os.getenv('CUSTOMER_SERVICE_PHONE')}"  # Format phone number for dialing
+        phone_link = f"tel:{CUSTOMER_SERVICE_PHONE}"  # Format phone number for dialing
         self.set_xy(10, 255)  # Position below the map link
-        self.cell(0, 10, f"{os.getenv('CUSTOMER_SERVICE_ADDRESS')}", align="C", link=phone_link)
+        self.cell(0, 10, CUSTOMER_SERVICE_ADDRESS, align="C", link=phone_link)
 
     async def generate_receipt(self):
         """Generates the receipt PDF content asynchronously."""
+        self.logo_path, self.qr_path = await _prepare_images(self._load_logo, self.data['reference'])
+        return self._render()
+
+    def _render(self):
+        """Lays out the receipt and returns the raw PDF as a BytesIO."""
         self.add_page()
         self._add_static_elements()
 
@@ -256,31 +319,80 @@ class Receipt(FPDF, HTMLMixin):
 
         self._add_map_link()
 
-        pdf_bytes = self.output(dest="S").encode("latin1")
-        return io.BytesIO(pdf_bytes)
+        return pdf_stream(self)
 
     async def create_receipt(self):
         """Creates and encrypts the receipt, returning a URL and access password."""
-        raw_pdf = await self.generate_receipt()  # Generate the PDF as BytesIO
+        from models import cache
+
+        cache_key = receipt_cache_key(self.data)
+        cached = cache.get(cache_key)
+        if cached:
+            return io.BytesIO(cached)
+
+        pdf_bytes = await _run_in_receipt_pool(_make_receipt, self.data)
+        cache.set(cache_key, pdf_bytes, expire=RECEIPT_CACHE_TTL)
+        return io.BytesIO(pdf_bytes)
+
+    @classmethod
+    async def create_receipts_batch(cls, items):
+        """
+        Creates and encrypts several receipts at once.
+
+        Each receipt goes through create_receipt, so cached receipts are reused and the
+        others are rendered and encrypted concurrently in the receipt process pool.
 
-        # Write raw PDF to a temporary file to ensure compatibility with pikepdf
-        temp_file_path = "/tmp/temp_receipt.pdf"
-        with open(temp_file_path, "wb") as temp_file:
-            temp_file.write(raw_pdf.getbuffer())
+        :param items: The receipt data for each receipt, as stored in the cache.
+        :return: The encrypted PDFs as BytesIO streams, in the order of `items`.
+        """
+        return await asyncio.gather(*[cls(data).create_receipt() for data in items])
 
-        # Encrypt and save the PDF to an output BytesIO stream
-        output = io.BytesIO()
-        with pikepdf.open(temp_file_path) as pdf:
-            pdf.save(output, encryption=pikepdf.Encryption(user=self.data['password']))
 
-        # Remove the temporary file
-        os.remove(temp_file_path)
+def _encrypt_pdf(raw_pdf, password):
+    """
+    Encrypts a rendered PDF straight from memory; pikepdf accepts file-like objects.
 
-        output.seek(0)  # Reset to the start of the stream for reading
-        return output
+    :param raw_pdf: The unencrypted PDF as a BytesIO.
+    :param password: The user password required to open the PDF.
+    :return: The encrypted PDF as bytes.
+    """
+    raw_pdf.seek(0)
+    output = io.BytesIO()
+    with pikepdf.open(raw_pdf) as pdf:
+        pdf.save(output, encryption=pikepdf.Encryption(user=password))
 
+    return output.getvalue()
 
-class POSReceipt(FPDF, HTMLMixin):
+
+def receipt_cache_key(data):
+    """
+    Builds the Redis key of an encrypted receipt from all of its data.
+
+    A re-posted order reuses its reference but gets a new password and may carry
+    other holder or ticket details, so the key covers every field rather than the
+    reference alone; hashing keeps the password out of the key name.
+
+    :param data: The receipt data, as stored in the cache.
+    :return: The cache key.
+    """
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+    return f"receipt:{digest}"
+
+
+def _make_receipt(data):
+    """
+    Renders and encrypts a receipt in a worker process.
+
+    Kept at module level so it can be pickled by the process pool.
+
+    :param data: The receipt data, as stored in the cache.
+    :return: The encrypted PDF as bytes.
+    """
+    raw_pdf = Receipt(data)._render()
+    return _encrypt_pdf(raw_pdf, data['password'])
+
+
+class POSReceipt(FontCacheMixin, ImageCacheMixin, FPDF, HTMLMixin):
     """Class to generate a POS-sized receipt optimized for thermal printers."""
 
     def __init__(self, data):
@@ -296,7 +408,8 @@ class POSReceipt(FPDF, HTMLMixin):
         super().__init__(format=(pos_width_mm, pos_height_mm))
 
         self.data = data
-        self.logo_stream = None
+        self.logo_path = None
+        self.qr_path = None
 
     def add_static_elements(self):
         """Adds static elements like borders, title, and logo for the POS receipt."""
@@ -310,47 +423,41 @@ class POSReceipt(FPDF, HTMLMixin):
 
     def set_title(self, title='Benny Osbon Limited'):
         """Sets the receipt title with smaller text for POS size."""
-        self.set_font("Helvetica", "B", self.font_size_main - 2)
+        self._safe_set_font("Helvetica", "B", self.font_size_main - 2)
         self.cell(0, 1, title, ln=True, align="C")
 
     def load_logo(self, logo_path='./assets/web-logo.png'):
-        """Load, resize, and cache the logo image for POS dimensions."""
-        if not self.logo_stream:
-            with Image.open(logo_path) as img:
-                resized_logo = img.resize((100, 100), Image.Resampling.LANCZOS)
-                temp_file = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-                resized_logo.save(temp_file, format="PNG")
-                temp_file.close()
-            self.logo_stream = temp_file.name
-        return self.logo_stream
+        """Return the logo resized for POS dimensions, shared by every receipt in the process."""
+        return cached_logo(logo_path, 100, 100)
 
     def set_logo(self):
         """Place the logo in the PDF using the cached image stream."""
-        logo = self.load_logo()
+        logo = self.logo_path or self.load_logo()
         x_position = (self.w - 30) / 2
-        self.image(logo, x=x_position, y=2.5, w=30, h=30)
+        self._cached_image(logo, x=x_position, y=2.5, w=30, h=30)
 
     def insert_qr_image(self):
         """Generates and inserts a QR code based on user data."""
-        qr_engine = QrCodeEngine(self.data['reference'])
-        qr_path = qr_engine.generate_code()
+        qr_path = self.qr_path or qr_code_for(self.data['reference'])
         x_position = (self.w - self.qr_size) / 2
         self.image(qr_path, x=x_position, y=20, w=self.qr_size, h=self.qr_size)
 
     def set_text(self, text, spacing, bold=True):
         """Adds text to the receipt with POS-sized adjustments."""
-        self.set_font("Helvetica", "B" if bold else "", self.font_size_main)
+        self._safe_set_font("Helvetica", "B" if bold else "", self.font_size_main)
         self.set_xy(self.margin_x + 5, spacing)
         self.cell(0, 10, text, ln=True, align="C")
 
     def _add_phone_link(self):
         # Add a clickable phone number
-        phone_link = f"tel:{os.getenv('CUSTOMER_SERVICE_PHONE', '233 27 517 7177')}"  # Format phone number for dialing
+        phone_link = f"tel:{CUSTOMER_SERVICE_PHONE}"  # Format phone number for dialing
         self.set_xy(self.margin_x + 5, 69.95)  # Position below the map link
-        self.cell(0, 10, f"Call us on:  {os.getenv('CUSTOMER_SERVICE_PHONE')}", align="C", link=phone_link)
+        self.cell(0, 10, f"Call us on:  {CUSTOMER_SERVICE_PHONE}", align="C", link=phone_link)
 
     async def generate_receipt(self):
         """Generates the receipt content based on POS dimensions."""
+        self.logo_path, self.qr_path = await _prepare_images(self.load_logo, self.data['reference'])
+
         self.add_page()
         self.add_static_elements()
 
@@ -370,38 +477,61 @@ class POSReceipt(FPDF, HTMLMixin):
 
         self._add_phone_link()
 
-        pdf_bytes = self.output(dest="S").encode("latin1")
-        return io.BytesIO(pdf_bytes)
+        return pdf_stream(self)
 
     async def create_receipt(self):
         """Generates the POS receipt and returns it as an in-memory PDF file."""
         return await self.generate_receipt()
 
 
-from html.parser import HTMLParser
-
-
-class HTMLTextParser(HTMLParser):
+class HTMLTextParser:
     """Simple HTML parser for basic tag handling in FPDF."""
 
+    # Opening or closing tag; the tag name is captured, attributes are ignored
+    TAG_PATTERN = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)\b[^>]*>")
+    # Comments (including conditional ones) and declarations such as <!DOCTYPE>
+    COMMENT_PATTERN = re.compile(r"<!--.*?-->|<![^>]*>", re.S)
+
     def __init__(self, pdf, wrap_width):
-        super().__init__()
         self.pdf = pdf
         self.wrap_width = wrap_width
         self.font_style = ""
         self.total_height = 0
 
+    def reset(self):
+        """Reset the tracked style and height so the instance can be reused."""
+        self.font_style = ""
+        self.total_height = 0
+
+    def feed(self, text):
+        """Split the text on tags, rendering the text between them."""
+        text = self.COMMENT_PATTERN.sub("", text)
+        pos = 0
+        for match in self.TAG_PATTERN.finditer(text):
+            if match.start() > pos:
+                self.handle_data(html.unescape(text[pos:match.start()]))
+
+            tag = match.group(2).lower()
+            if match.group(1):
+                self.handle_endtag(tag)
+            else:
+                self.handle_starttag(tag, None)
+            pos = match.end()
+
+        if pos < len(text):
+            self.handle_data(html.unescape(text[pos:]))
+
     def handle_starttag(self, tag, attrs):
         """Apply font styles based on HTML tags."""
         if tag == "b":
             self.font_style = "B"
-            self.pdf.set_font("Helvetica", "B")
+            self.pdf._safe_set_font("Helvetica", "B")
         elif tag == "i":
             self.font_style = "I"
-            self.pdf.set_font("Helvetica", "I")
+            self.pdf._safe_set_font("Helvetica", "I")
         elif tag == "u":
             self.font_style = "U"
-            self.pdf.set_font("Helvetica", "U")
+            self.pdf._safe_set_font("Helvetica", "U")
         elif tag == "br":
             self.pdf.ln(5)  # Line break for <br> tag
 
@@ -409,14 +539,18 @@ class HTMLTextParser(HTMLParser):
         """Reset font style after closing a tag."""
         if tag in ["b", "i", "u"]:
             self.font_style = ""
-            self.pdf.set_font("Helvetica", "")
+            self.pdf._safe_set_font("Helvetica", "")
 
     def handle_data(self, data):
         """Render text data with the current style and track the height."""
+        if not data.strip():
+            return
+
         line_height = 10  # Define the height of each line
-        lines = data.splitlines()  # Split the data into lines
-        for line in lines:
-            # Calculate the number of lines based on the wrap width
-            num_lines = len(line) // self.wrap_width + 1
-            self.total_height += num_lines * line_height  # Update total height
-            self.pdf.multi_cell(self.wrap_width, line_height, line, align="C")
+
+        # multi_cell breaks on newlines and wraps each paragraph, count lines the same way
+        num_lines = sum(int(self.pdf.get_string_width(line) // self.wrap_width) + 1
+                        for line in data.split("\n"))
+        self.total_height += num_lines * line_height  # Update total height
+
+        self.pdf.multi_cell(self.wrap_width, line_height, data, align="C")
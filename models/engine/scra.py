@@ -1,15 +1,13 @@
 import io
-import os
-import tempfile
 
 import pikepdf
-from PIL import Image
 from fpdf import FPDF, HTMLMixin
 
-from models.engine.qr_code_engine import QrCodeEngine
+from models.engine.pdf_utils import FontCacheMixin, ImageCacheMixin, cached_logo, pdf_stream
+from models.engine.qr_code_engine import qr_code_for
 
 
-class Receipt(FPDF, HTMLMixin):
+class Receipt(FontCacheMixin, ImageCacheMixin, FPDF, HTMLMixin):
     """Class to generate and encrypt PDF receipts asynchronously for event tickets."""
 
     def __init__(self, data, paper_size='A4'):
@@ -34,7 +32,6 @@ class Receipt(FPDF, HTMLMixin):
 
         self.data = data
         self.paper_size = paper_size
-        self.logo_stream = None
 
     def add_static_elements(self):
         """Adds static elements like borders, title, and logo to the receipt."""
@@ -48,45 +45,36 @@ class Receipt(FPDF, HTMLMixin):
 
     def set_title(self, title='Benny Osbon Limited'):
         """Sets the receipt title."""
-        self.set_font("Helvetica", "B", self.font_size_main)
+        self._safe_set_font("Helvetica", "B", self.font_size_main)
         self.cell(0, 10, title, ln=True, align="C")
 
     def load_logo(self, logo_path='./assets/web-logo.png'):
-        """Load, resize, and cache the logo image."""
-        if not self.logo_stream:
-            with Image.open(logo_path) as img:
-                resized_logo = img.resize((50, 50),
-                                          Image.Resampling.LANCZOS) if self.paper_size == 'POS' else img.resize(
-                    (150, 150))
-                temp_file = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-                resized_logo.save(temp_file, format="PNG")
-                temp_file.close()
-            self.logo_stream = temp_file.name
-        return self.logo_stream
+        """Return the resized logo, shared by every receipt in the process."""
+        size = 50 if self.paper_size == 'POS' else 150
+        return cached_logo(logo_path, size, size)
 
     def set_logo(self):
         """Place the logo in the PDF using the cached image stream."""
         logo = self.load_logo()
         x_position = (self.w - 50) / 2
-        self.image(logo, x=x_position, y=self.margin_y, w=30 if self.paper_size == 'POS' else 50)
+        self._cached_image(logo, x=x_position, y=self.margin_y, w=30 if self.paper_size == 'POS' else 50)
 
     def insert_qr_image(self):
         """Generates and inserts a QR code based on user data."""
-        qr_engine = QrCodeEngine(self.data['reference'])
-        qr_path = qr_engine.generate_code()
+        qr_path = qr_code_for(self.data['reference'])
         x_position = (self.w - self.qr_size) / 2
         self.image(qr_path, x=x_position, y=35, w=self.qr_size, h=self.qr_size)
 
     def set_text(self, text, spacing, bold=True):
         """Adds text to the receipt, adjusting font size and positioning based on paper size."""
-        self.set_font("Helvetica", "B" if bold else "", self.font_size_main)
+        self._safe_set_font("Helvetica", "B" if bold else "", self.font_size_main)
         self.set_xy(self.margin_x, spacing)
         self.cell(0, 10, text, ln=True, align="C")
 
     def add_map_link(self):
         """Adds a clickable Google Maps link for the event location."""
         self.set_xy(self.margin_x, self.h - 20)
-        self.set_font("Helvetica", "B", self.font_size_main - 2)
+        self._safe_set_font("Helvetica", "B", self.font_size_main - 2)
         self.set_text_color(0, 0, 255)
         self.cell(0, 10, "Event Location", align="C", link=self.data['event_coordinates'])
 
@@ -106,21 +94,17 @@ class Receipt(FPDF, HTMLMixin):
         self.set_text(f'{start_time} - {end_time}', spacing=150)
         self.add_map_link()
 
-        pdf_bytes = self.output(dest="S").encode("latin1")
-        return io.BytesIO(pdf_bytes)
+        return pdf_stream(self)
 
     async def create_receipt(self):
         """Creates and encrypts the receipt, returning a URL and access password."""
         raw_pdf = await self.generate_receipt()
-        temp_file_path = "/tmp/temp_receipt.pdf"
-        with open(temp_file_path, "wb") as temp_file:
-            temp_file.write(raw_pdf.getbuffer())
+        raw_pdf.seek(0)
 
         output = io.BytesIO()
-        with pikepdf.open(temp_file_path) as pdf:
+        with pikepdf.open(raw_pdf) as pdf:
             pdf.save(output, encryption=pikepdf.Encryption(user=self.data['password']))
 
-        os.remove(temp_file_path)
         output.seek(0)
         return output
 
@@ -2,7 +2,7 @@
 """
 The events module defines the event mode/ entity
 """
-from sqlalchemy import Column, String, Integer, Numeric, Date, Time, Text
+from sqlalchemy import Column, String, Integer, Numeric, Date, Time, Text, Index
 
 from models.basemodel import BaseModel, Base
 
@@ -13,6 +13,10 @@ class Event(BaseModel, Base):
     :args
     """
     __tablename__ = 'events'
+    __table_args__ = (
+        Index('ix_events_start_status', 'start_date', 'status'),
+        Index('ix_events_category', 'event_category_id'),
+    )
 
     name = Column(String(255), unique=True)
     location = Column(String(255))
@@ -34,28 +38,3 @@ class Event(BaseModel, Base):
     status = Column(String(255), nullable=False)
     reviewed_by = Column(String(255))
     service_charge = Column(Numeric(10, 2))
-
-    def __init__(self, name, location, refund_policy, description, images, start_date, end_date, start_time, end_time,
-                 coordinates, user_id, country_id, region_id, event_category_id, pricing, floor_plan, status,
-                 reviewed_by, service_charge, **kwargs):
-        super().__init__(**kwargs)
-        self.name = name
-        self.location = location
-        self.refund_policy = refund_policy
-        self.description = description
-        self.images = images
-        self.start_date = start_date
-        self.end_date = end_date
-        self.start_time = start_time
-        self.end_date = end_date
-        self.coordinates = coordinates
-        self.user_id = user_id
-        self.country_id = country_id
-        self.region_id = region_id
-        self.event_category_id = event_category_id
-        self.pricing = pricing
-        self.floor_plan = floor_plan
-        self.end_time = end_time
-        self.status = status
-        self.reviewed_by = reviewed_by
-        self.service_charge = service_charge
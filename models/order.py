@@ -2,7 +2,7 @@
 """
 The orders module defines the order model/entity.
 """
-from sqlalchemy import Column, String, Integer, Numeric, BigInteger, TIMESTAMP, Text
+from sqlalchemy import Column, String, Integer, Numeric, BigInteger, TIMESTAMP, Text, Index
 
 from models.basemodel import BaseModel, Base
 
@@ -35,6 +35,11 @@ class Order(BaseModel, Base):
     """
 
     __tablename__ = 'orders'
+    __table_args__ = (
+        Index('ix_orders_user_payment', 'user_id', 'payment_status'),
+        Index('ix_orders_reference', 'reference'),
+        Index('ix_orders_ticket_id', 'ticket_id'),
+    )
 
     user_id = Column(BigInteger, nullable=False)
     ticket_id = Column(BigInteger, nullable=False)
@@ -61,31 +66,3 @@ class Order(BaseModel, Base):
     # # Define relationships if necessary
     # user = relationship('User', back_populates='orders')  # Assuming User model has 'orders' relationship
     # ticket = relationship('Ticket', back_populates='orders')  # Assuming Ticket model has 'orders' relationship
-
-    def __init__(self, user_id, ticket_id, quantity, price, ticket_type, currency, qr_code,
-                 payment_status='pending', delivery_status='pending', tickets_left=1,
-                 reference=None, other_details=None, delivery_info=None, admission_details=None,
-                 created_at=None, updated_at=None, deleted_at=None, myghpay_session_code=None,
-                 discount_info=None, discount_amount=0.00, chale_service_charge=0.00, **kwargs):
-        super().__init__(**kwargs)
-        self.user_id = user_id
-        self.ticket_id = ticket_id
-        self.quantity = quantity
-        self.price = price
-        self.reference = reference
-        self.other_details = other_details
-        self.ticket_type = ticket_type
-        self.currency = currency
-        self.payment_status = payment_status
-        self.qr_code = qr_code
-        self.delivery_status = delivery_status
-        self.delivery_info = delivery_info
-        self.tickets_left = tickets_left
-        self.admission_details = admission_details
-        self.created_at = created_at
-        self.updated_at = updated_at
-        self.deleted_at = deleted_at
-        self.myghpay_session_code = myghpay_session_code
-        self.discount_info = discount_info
-        self.discount_amount = discount_amount
-        self.chale_service_charge = chale_service_charge
@@ -23,10 +23,3 @@ class Social(BaseModel, Base):
     platform = Column(String(255), nullable=False)
     user_id = Column(BigInteger, nullable=False)
     handle = Column(String(255), nullable=False, unique=True)
-
-
-    def __init__(self, platform, user_id, handle, **kwargs):
-        super().__init__(**kwargs)
-        self.platform = platform
-        self.user_id = user_id
-        self.handle = handle
\ No newline at end of file
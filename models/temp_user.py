@@ -18,16 +18,3 @@ class TempUser(BaseModel, Base):
     remember_token = Column(String(100), nullable=True)
     google_id = Column(String(255), nullable=True)
     otp = Column(String(255), nullable=True)
-
-    def __init__(self, name, phone, email, country_id, password, google_id=None, otp=None, email_verified_at=None,
-                 remember_token=None, **kwargs):
-        super().__init__(**kwargs)
-        self.name = name
-        self.phone = phone
-        self.email = email
-        self.country_id = country_id
-        self.password = password
-        self.google_id = google_id
-        self.otp = otp
-        self.email_verified_at = email_verified_at
-        self.remember_token = remember_token
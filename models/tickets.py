@@ -3,6 +3,7 @@
 The tickets module defines the ticket model/entity.
 """
 from sqlalchemy import Column, String, Integer, Text, BigInteger
+from sqlalchemy.orm import relationship
 
 from models.basemodel import BaseModel, Base
 
@@ -19,6 +20,8 @@ class Ticket(BaseModel, Base):
     :param entries_allowed_per_ticket: The number of entries allowed per ticket.
     :param event_id: The ID of the associated event.
     :param tour_id: The ID of the associated tour (if applicable).
+    :param event: The associated event, only available when loaded eagerly.
+    :param tour: The associated tour, only available when loaded eagerly.
     :param created_at: The timestamp when the ticket was created.
     :param updated_at: The timestamp when the ticket was last updated.
     :param deleted_at: The timestamp when the ticket was deleted (soft delete).
@@ -35,17 +38,8 @@ class Ticket(BaseModel, Base):
     event_id = Column(BigInteger, nullable=True)
     tour_id = Column(BigInteger, nullable=True)
 
-    def __init__(self, title, quantity, price, entries_allowed_per_ticket, event_id=None, tour_id=None,
-                 description=None, image=None, created_at=None, updated_at=None, deleted_at=None, **kwargs):
-        super().__init__(**kwargs)
-        self.title = title
-        self.description = description
-        self.quantity = quantity
-        self.image = image
-        self.price = price
-        self.entries_allowed_per_ticket = entries_allowed_per_ticket
-        self.event_id = event_id
-        self.tour_id = tour_id
-        self.created_at = created_at
-        self.updated_at = updated_at
-        self.deleted_at = deleted_at
+    # No foreign keys to infer the joins from; lazy='raise' stops N+1 per-row loads
+    event = relationship('Event', primaryjoin='foreign(Ticket.event_id) == Event.id',
+                         viewonly=True, lazy='raise')
+    tour = relationship('Tour', primaryjoin='foreign(Ticket.tour_id) == Tour.id',
+                        viewonly=True, lazy='raise')
@@ -3,6 +3,7 @@
 The tours module defines the tour model/entity.
 """
 from sqlalchemy import Column, String, Integer, BigInteger, Numeric, Date, Time, Text
+from sqlalchemy.orm import relationship
 
 from models.basemodel import BaseModel, Base
 
@@ -36,29 +37,8 @@ class Tour(BaseModel, Base):
     status = Column(String(255), default="pending", nullable=False)
     service_charge = Column(Numeric(10, 2), default=0.00, nullable=True)
 
-    def __init__(self, name, images, location, pickup_date, pickup_time, end_date, end_time, seats, country_id,
-                 region_id, more_info, cancellation_policy, tour_guide_languages, wheel_chair_accessible, highlights,
-                 includes, meeting_point, know_before_you_go, user_id, approved_by, status, service_charge, **kwargs):
-        super().__init__(**kwargs)
-        self.name = name
-        self.images = images
-        self.location = location
-        self.pickup_date = pickup_date
-        self.pickup_time = pickup_time
-        self.end_date = end_date
-        self.end_time = end_time
-        self.seats = seats
-        self.country_id = country_id
-        self.region_id = region_id
-        self.more_info = more_info
-        self.cancellation_policy = cancellation_policy
-        self.tour_guide_languages = tour_guide_languages
-        self.wheel_chair_accessible = wheel_chair_accessible
-        self.highlights = highlights
-        self.includes = includes
-        self.meeting_point = meeting_point
-        self.know_before_you_go = know_before_you_go
-        self.user_id = user_id
-        self.approved_by = approved_by
-        self.status = status
-        self.service_charge = service_charge
+    # Eager-load only, like the relationships on Ticket
+    owner = relationship('User', primaryjoin='foreign(Tour.user_id) == User.id',
+                         viewonly=True, lazy='raise')
+    approver = relationship('User', primaryjoin='foreign(Tour.approved_by) == User.id',
+                            viewonly=True, lazy='raise')
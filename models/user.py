@@ -2,15 +2,19 @@
 """
 The users module defines the user model/entity
 """
-from datetime import datetime
+import logging
+import operator
+from datetime import datetime, timezone
 
 from sqlalchemy import Column, String, BigInteger, TIMESTAMP
 from sqlalchemy.sql import func
 
-from models.basemodel import Base, BaseModel
+from models.basemodel import Base, DTOMixin
 
+logger = logging.getLogger(__name__)
 
-class User(Base):
+
+class User(DTOMixin, Base):
     """
     The user model defines the user entity
     """
@@ -26,15 +30,16 @@ class User(Base):
     remember_token = Column(String(100), nullable=True)
     google_id = Column(String(255), nullable=True)
     otp = Column(String(255), nullable=True)
-    created_at = Column(TIMESTAMP, server_default=func.now())
-    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+    # Set in Python so the ORM already knows the values after an INSERT and does not
+    # reload them; the server defaults still cover rows written by other clients
+    created_at = Column(TIMESTAMP, default=datetime.now, server_default=func.now())
+    updated_at = Column(TIMESTAMP, default=datetime.now, server_default=func.now(), onupdate=datetime.now)
+    # Added by migrations/001_users_deleted_at.sql
+    deleted_at = Column(TIMESTAMP, nullable=True, index=True)
 
     def __init__(self, name, phone, email, country_id, password, google_id=None, otp=None, email_verified_at=None,
                  remember_token=None, **kwargs):
         super().__init__(**kwargs)
-        if kwargs:
-            for key,value in kwargs.items():
-                setattr(self, key, value)
         self.name = name
         self.phone = phone
         self.email = email
@@ -49,19 +54,20 @@ class User(Base):
         """
         Converts the model instance into a dictionary format.
         """
-        obj = {column.name: getattr(self, column.name) for column in self.__table__.columns}
-        obj["created_at"] = self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None
-        obj["updated_at"] = self.updated_at.strftime('%Y-%m-%d %H:%M:%S') if self.updated_at else None
-        if "start_date" in self.__dict__:
-            obj["start_date"] = self.start_date.strftime('%Y-%m-%d') if self.start_date else None
-            obj["start_time"] = self.start_date.strftime('%H:%M:%S') if self.start_time else None
-            obj["end_date"] = self.end_date.strftime('%Y-%m-%d') if self.end_date else None
-            obj["end_time"] = self.end_time.strftime('%H:%M:%S') if self.end_time else None
+        return self._serialize_row(dict(zip(self._COLUMN_NAMES, self._get_columns(self))))
 
+    @staticmethod
+    def _serialize_row(obj):
+        """
+        Formats the timestamps of a dictionary of column values, in place.
+        """
+        for key in ("created_at", "updated_at", "deleted_at"):
+            value = obj[key]
+            obj[key] = value.isoformat(sep=' ', timespec='seconds') if value else None
         return obj
 
     def delete(self):
-        self.deleted_at = datetime.datetime.now(datetime.timezone.utc)
+        self.deleted_at = datetime.now(timezone.utc)
         self.save()
 
     def save(self):
@@ -69,22 +75,32 @@ class User(Base):
         try:
             storage.new(self)
             storage.save()
-        except Exception as e:
-            # Handle exceptions (log them, re-raise, etc.)
-            print(f"Error saving model: {e}")
+        except Exception:
+            logger.warning("Error saving user", exc_info=True)
+            raise
 
     def update(self):
         from models import storage
         try:
             storage.save()
-        except Exception as e:
-            # Handle exceptions (log them, re-raise, etc.)
-            print(f"Error updating model: {e}")
+        except Exception:
+            logger.warning("Error updating user", exc_info=True)
+            raise
 
     @classmethod
     def all(cls, page=None, page_size=10):
         from models import storage
-        return storage.all(cls, page=page, page_size=page_size)
+        # Serialized straight from the rows, without loading User instances
+        return [cls._serialize_row(row) for row in storage.select_rows(cls, page=page, page_size=page_size)]
+
+    @classmethod
+    def iter_all(cls, chunk=1000):
+        """
+        Yields every user as a dictionary, reading `chunk` rows per query.
+        """
+        from models import storage
+        for row in storage.iter_rows(cls, chunk=chunk):
+            yield cls._serialize_row(row)
 
     @classmethod
     def all_valid(cls, page=None, page_size=10):
@@ -109,13 +125,20 @@ class User(Base):
     @classmethod
     def dynamic_query(cls, filters=None, page=None, page_size=10):
         from models import storage
-        return storage.dynamic_query(cls, filters=filters, page=page,
-                                     page_size=page_size)
+        return [cls._serialize_row(row) for row in storage.select_rows(cls, filters=filters, page=page,
+                                                                        page_size=page_size)]
     
     @classmethod
     def bulk_insert(cls, data_list):
+        """Inserts a list of column-name dicts; see DBStorage.bulk_insert."""
         from models import storage
         try:
             storage.bulk_insert(cls=cls, data_list=data_list)
-        except Exception as e:
-            print(f"Error Inserting bulk: {e}")
+        except Exception:
+            logger.warning("Error inserting users in bulk", exc_info=True)
+            raise
+
+
+# Resolved once so to_dict does not walk __table__.columns on every call
+User._COLUMN_NAMES = tuple(column.name for column in User.__table__.columns)
+User._get_columns = operator.attrgetter(*User._COLUMN_NAMES)
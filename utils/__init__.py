@@ -0,0 +1,11 @@
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=None)
+def load_env():
+    """
+    Loads the .env file into the environment, once per process however many modules ask.
+    """
+    load_dotenv()
@@ -1,53 +1,51 @@
 #!/usr/bin/env python3
 # Load the API key from the environment
+import hmac
+import math
 import os
+import secrets
+import string
 from datetime import datetime
 from functools import wraps
 
-from dotenv import load_dotenv
 from flask import abort, request
 
-load_dotenv()
+from utils import load_env
+
+# Load environment variables from .env file
+load_env()
 
 API_KEY = os.getenv("API_KEY")
+# Encoded once for the constant-time comparison; no key configured means nothing is authorised
+_API_KEY_BYTES = API_KEY.encode() if API_KEY else None
+
+# Characters used for user-facing tokens (digits, uppercase, lowercase)
+_ALPHABET = string.ascii_letters + string.digits
+
+
+def _check_api_key():
+    # Get API key from request headers
+    api_key = request.headers.get("X-API-Key", "")
+
+    # Check if the API key is valid, in constant time
+    if _API_KEY_BYTES is None or not hmac.compare_digest(api_key.encode(), _API_KEY_BYTES):
+        abort(401, description="Unauthorized: Invalid API Key")
 
 
 def require_api_key(func):
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        # Get API key from request headers
-        api_key = request.headers.get("X-API-Key")
-
-        # Check if the API key is valid
-        if api_key != API_KEY:
-            abort(401, description="Unauthorized: Invalid API Key")
+        _check_api_key()
 
         # Proceed if the key is valid
         return func(*args, **kwargs)
 
-    wrapper.__name__ = func.__name__
     return wrapper
 
 
 def protected():
-    def admin_decorator(fn):
-        @wraps(fn)
-        def wrapper(*args, **kwargs):
-            # Get API key from request headers
-            api_key = request.headers.get("X-API-Key")
-
-            # Check if the API key is valid
-            if api_key != API_KEY:
-                abort(401, description="Unauthorized: Invalid API Key")
-            else:
-                return fn(*args, **kwargs)
+    return require_api_key
 
-        return wrapper
-
-    return admin_decorator
-
-
-import secrets
-import string
 
 
 def generate_api_key(length=32):
@@ -58,27 +56,28 @@ def generate_api_key(length=32):
         length (int): The length of the API key to generate.
 
     Returns:
-        str: A random API key of the specified length.
+        str: A random URL-safe API key of the specified length.
     """
-    # Create a set of characters to choose from (digits, uppercase, lowercase)
-    characters = string.ascii_letters + string.digits
-    api_key = ''.join(secrets.choice(characters) for _ in range(length))
-    return api_key
+    # token_urlsafe base64-encodes the random bytes in C, 4 characters per 3 bytes
+    return secrets.token_urlsafe(math.ceil(length * 3 / 4))[:length]
 
 
-def generate_token(length=6):
-    characters = string.ascii_letters + string.digits
-    token = ''.join(secrets.choice(characters) for _ in range(length))
-    return token
+def generate_token(length=6, _choice=secrets.choice, _alphabet=_ALPHABET):
+    # Defaults bind the lookups locally; a list comprehension joins faster than a generator
+    return ''.join([_choice(_alphabet) for _ in range(length)])
 
 
-def format_date_time(date_str, time_str):
-    # Combine date and time into a single string
-    combined_str = f"{date_str} {time_str}"
+# Display format for event dates, e.g. "November 03, 2024 06:00PM GMT"
+_DATE_TIME_FORMAT = "%B %d, %Y %I:%M%p GMT"
 
-    # Parse the combined string to a datetime object
-    dt = datetime.strptime(combined_str, "%Y-%m-%d %H:%M:%S")
+
+def format_date_time(date_str, time_str):
+    # Date and time columns render as ISO strings, which fromisoformat parses without
+    # strptime's format-string handling
+    try:
+        dt = datetime.fromisoformat(f"{date_str}T{time_str}")
+    except ValueError:
+        dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S")
 
     # Format to the desired output
-    formatted_date_time = dt.strftime("%B %d, %Y %I:%M%p GMT")
-    return formatted_date_time
+    return dt.strftime(_DATE_TIME_FORMAT)